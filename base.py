@@ -5,6 +5,8 @@ from typing import Final
 
 import orjson
 
+from index import INDEX_FOLDER, INDEX_SUFFIX, save_index
+
 # 类型别名和常量定义
 type Ldata = dict[str, str]
 P: Final[Path] = Path(__file__).resolve().parent
@@ -30,6 +32,7 @@ def save_to_json(
     input_data: tuple[Ldata, float],
     output_file: str,
     output_folder: str = "output",
+    index: bool = True,
 ) -> None:
     """将生成的语言文件保存至JSON。
 
@@ -37,17 +40,22 @@ def save_to_json(
         input_data (tuple[Ldata, float]): 输入的数据
         output_file (str): 保存的文件名，无格式后缀
         output_folder (str, optional): 保存的文件夹，默认为“output”
+        index (bool, optional): 是否同时在保存的文件夹下的“index”中保存逐键哈希索引，默认为True
 
     Raises:
         OSError: 文件保存失败
     """
     try:
         input_dict, elapsed_time = input_data
-        (P / output_folder).mkdir(exist_ok=True)
+        (P / output_folder).mkdir(parents=True, exist_ok=True)
         file_path = P / output_folder / f"{output_file}.json"
         json_bytes = orjson.dumps(input_dict, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
         with open(file_path, "wb") as j:
             j.write(json_bytes)
+        if index:
+            save_index(
+                input_dict, P / output_folder / INDEX_FOLDER / f"{output_file}{INDEX_SUFFIX}"
+            )
         size = file_size(file_path)
         print(f"已生成语言文件“{output_file}.json”，大小{size}，耗时{elapsed_time:.2f} s。")
     except Exception as e:
@@ -2,10 +2,11 @@
 
 import re
 import time
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 
-import jieba
 from pypinyin import Style, lazy_pinyin, load_phrases_dict
+from pypinyin.constants import PHRASES_DICT, PINYIN_DICT, RE_HANS
+from pypinyin.seg import mmseg
 from pypinyin_dict.phrase_pinyin_data import cc_cedict, di
 from romajitable import to_kana as tk
 
@@ -14,29 +15,112 @@ from base import (
     PINYIN_TO,
     TONE_TO_IPA,
     Ldata,
-    P,
     cy_values,
     gr_values,
     load_json,
     rep_ja_kk,
     rep_zh,
 )
+from segment import JiebaSegmenter, Segmenter
 
 # 初始化pypinyin
 cc_cedict.load()
 di.load()
 phrases = load_json("phrases")
+# 被自定义词语覆盖前的词典读音，None表示原本不在词典中，监视模式中用于恢复删除的词语
+phrases_base: dict[str, list[list[str]] | None] = {k: PHRASES_DICT.get(k) for k in phrases}
 load_phrases_dict({k: [[_] for _ in v.split()] for k, v in phrases.items()})
 
-# 初始化jieba
-jieba.load_userdict(str(P / "data" / "dict.txt"))
-
 # 初始化其他自定义数据
 fixed_zh_u = load_json("fixed_zh_universal", "data/fixed")
 manyoganas_dict: Ldata = load_json("manyogana")  # 万叶假名
 wei: Ldata = load_json("wei")  # 为
 
 
+# 按是否为有拼音的汉字拆分字符串，与pypinyin的初步分割方式一致
+RE_HAN_RUNS = re.compile(f"({RE_HANS.pattern.removeprefix('^(?:').removesuffix(')+$')}+)")
+
+
+class CharPinyinTable:
+    """逐字拼音缓存，用于不分词的转换方案。
+
+    若某字在所有含有它的词语中的读音都与其默认读音相同，则无论pypinyin如何切分词语，
+    该字的结果都与单独转换时相同，可直接查表。含有其他汉字的片段仍按pypinyin的方式切分词语，
+    各词语的结果与上下文无关，按词语缓存。
+
+    Attributes:
+        unsafe (set[str] | None): 结果依赖上下文的汉字，首次使用时计算
+        chars (dict[tuple, dict[str, str | None]]): 各拼音风格下的逐字结果，None表示需切分词语
+        words (dict[tuple, dict[str, list[str]]]): 各拼音风格下的逐词结果
+    """
+
+    def __init__(self) -> None:
+        """初始化逐字拼音缓存。"""
+        self.unsafe: set[str] | None = None
+        self.chars: dict[tuple, dict[str, str | None]] = {}
+        self.words: dict[tuple, dict[str, list[str]]] = {}
+
+    def reset(self) -> None:
+        """清空缓存，词语读音变动后需调用。"""
+        self.unsafe = None
+        self.chars.clear()
+        self.words.clear()
+
+    def _find_unsafe(self) -> set[str]:
+        """找出在词语中的读音与默认读音不同的汉字。"""
+        unsafe: set[str] = set()
+        for phrase, pys in PHRASES_DICT.items():
+            if len(phrase) != len(pys):
+                unsafe.update(phrase)
+                continue
+            for char, py in zip(phrase, pys, strict=True):
+                if py[0] != PINYIN_DICT.get(ord(char), "").split(",")[0]:
+                    unsafe.add(char)
+        return unsafe
+
+    def lazy_pinyin(self, text: str, style: Style = Style.NORMAL, **kwargs: bool) -> list[str]:
+        """与pypinyin.lazy_pinyin结果相同，但尽量逐字查表。
+
+        Args:
+            text (str): 需要转换的字符串
+            style (Style, optional): 拼音风格，默认为Style.NORMAL
+            **kwargs (bool): 传递给pypinyin.lazy_pinyin的其他参数
+
+        Returns:
+            list[str]: 拼音列表
+        """
+        if self.unsafe is None:
+            self.unsafe = self._find_unsafe()
+        key = (style, *sorted(kwargs.items()))
+        chars = self.chars.setdefault(key, {})
+        words = self.words.setdefault(key, {})
+
+        result: list[str] = []
+        for i, part in enumerate(RE_HAN_RUNS.split(text)):
+            if not part:
+                continue
+            if i % 2 == 0:  # 非汉字部分整体保留
+                result.append(part)
+                continue
+            for char in part:
+                if char not in chars:
+                    py = lazy_pinyin(char, style=style, **kwargs)
+                    safe = char not in self.unsafe and ord(char) in PINYIN_DICT and len(py) == 1
+                    chars[char] = py[0] if safe else None
+            pys = [chars[char] for char in part]
+            if None not in pys:
+                result.extend(pys)
+                continue
+            for word in mmseg.seg.cut(part):
+                if word not in words:
+                    words[word] = lazy_pinyin(word, style=style, **kwargs)
+                result.extend(words[word])
+        return result
+
+
+char_pinyin = CharPinyinTable()
+
+
 class ConverterError(Exception):
     """转换器基础异常类"""
 
@@ -166,6 +250,74 @@ class BaseConverter:
 
         return input_list
 
+    def prepare(self, key: str, text: str, func: Callable[[str], str]) -> str:
+        """在转换前对单条字符串进行预处理。
+
+        Args:
+            key (str): 字符串对应的键名
+            text (str): 需要转换的字符串
+            func (Callable[[str], str]): 字符串转换函数
+
+        Returns:
+            str: 预处理后的字符串
+        """
+        return text
+
+    def convert_items(
+        self,
+        func: Callable[[str], str],
+        keys: Iterable[str] | None = None,
+        memo: Ldata | None = None,
+    ) -> Ldata:
+        """逐条转换语言数据，不应用修正。
+
+        Args:
+            func (Callable[[str], str]): 字符串转换函数
+            keys (Optional[Iterable[str]], optional): 需要转换的键名，默认为全部
+            memo (Optional[Dict[str, str]], optional): 预处理后字符串到转换结果的缓存，
+                提供时相同的字符串只转换一次，并将新结果写入其中
+
+        Returns:
+            Ldata: 转换结果字典
+
+        Raises:
+            ConversionError: 转换过程出错
+        """
+        input_dict = self.data
+        output_dict: Ldata = {}
+        current_key = ""
+        try:
+            for current_key in input_dict if keys is None else keys:
+                text = self.prepare(current_key, input_dict[current_key], func)
+                if memo is None:
+                    output_dict[current_key] = func(text)
+                elif text in memo:
+                    output_dict[current_key] = memo[text]
+                else:
+                    output_dict[current_key] = memo[text] = func(text)
+        except Exception as e:
+            raise ConversionError(f"转换{current_key}时出现错误：{str(e)}") from e
+
+        return output_dict
+
+    def apply_fixes(self, output_dict: Ldata, fix_dict: Ldata | None = None) -> Ldata:
+        """将修正内容应用至转换结果。
+
+        Args:
+            output_dict (Ldata): 转换结果字典，将被原地修改
+            fix_dict (Optional[Dict[str, str]], optional): 修复内容字典
+
+        Returns:
+            Ldata: 修正后的转换结果字典
+        """
+        if self.rep is rep_zh:
+            output_dict.update(fixed_zh_u)
+
+        if fix_dict:
+            output_dict.update(fix_dict)
+
+        return output_dict
+
     def convert(
         self,
         func: Callable[[str], str],
@@ -188,23 +340,8 @@ class BaseConverter:
         try:
             if not rep:
                 rep = self.rep
-            input_dict = self.data
             start_time = time.time()
-
-            output_dict: Ldata = {}
-            try:
-                for k, v in input_dict.items():
-                    output_dict[k] = func(v)
-            except Exception as e:
-                current_key = list(input_dict.keys())[len(output_dict)]
-                raise ConversionError(f"转换{current_key}时出现错误：{str(e)}") from e
-
-            if self.rep is rep_zh:
-                output_dict.update(fixed_zh_u)
-
-            if fix_dict:
-                output_dict.update(fix_dict)
-
+            output_dict = self.apply_fixes(self.convert_items(func), fix_dict)
             return output_dict, time.time() - start_time
 
         except Exception as e:
@@ -288,65 +425,47 @@ class ChineseConverter(BaseConverter):
         data (Ldata): 输入的中文语言数据
         rep (Ldata, optional): 中文转写替换规则
         auto_cut (bool, optional): 是否使用自动分词
+        segmenter (Segmenter): 自动分词使用的分词器
     """
 
-    def __init__(self, data: Ldata, rep: Ldata = rep_zh, auto_cut: bool = True) -> None:
+    def __init__(
+        self,
+        data: Ldata,
+        rep: Ldata = rep_zh,
+        auto_cut: bool = True,
+        segmenter: Segmenter | None = None,
+    ) -> None:
         """初始化中文转换器。
 
         Args:
             data (Ldata): 输入的中文语言数据
             rep (Ldata, optional): 中文转写替换规则，默认为rep_zh
             auto_cut (bool, optional): 是否使用自动分词，默认为True
+            segmenter (Segmenter | None, optional): 分词器，默认为首次分词时创建的jieba分词器
         """
         super().__init__(data, rep)
         self.auto_cut = auto_cut
+        self._segmenter = segmenter
 
-    def convert(
-        self,
-        func: Callable[[str], str],
-        fix_dict: Ldata | None = None,
-        rep: Ldata | None = None,
-    ) -> tuple[Ldata, float]:
-        """转换语言数据。
+    @property
+    def segmenter(self) -> Segmenter:
+        """自动分词使用的分词器，未指定时在首次使用时创建jieba分词器。"""
+        if self._segmenter is None:
+            self._segmenter = JiebaSegmenter()
+        return self._segmenter
+
+    def prepare(self, key: str, text: str, func: Callable[[str], str]) -> str:
+        """在转换前对单条字符串进行预处理，将特定键名中的“为”替换为“位”。
 
         Args:
-            func (Callable[[str], str): 字符串转换函数
-            fix_dict (Optional[Dict[str, str]], optional): 修复内容字典
-            rep (Optional[Dict[str, str]], optional): 替换格式字典
+            key (str): 字符串对应的键名
+            text (str): 需要转换的字符串
+            func (Callable[[str], str]): 字符串转换函数
 
         Returns:
-            tuple[Dict[str, str], float): (转换结果字典，耗时秒数)
-
-        Raises:
-            ConversionError: 转换过程出错
+            str: 预处理后的字符串
         """
-        try:
-            if not rep:
-                rep = self.rep
-            input_dict = self.data
-            start_time = time.time()
-
-            output_dict: Ldata = {}
-            try:
-                for k, v in input_dict.items():
-                    string = (
-                        v.replace("为", "位") if k in wei and func.__name__ != "to_split" else v
-                    )
-                    output_dict[k] = func(string)
-            except Exception as e:
-                current_key = list(input_dict.keys())[len(output_dict)]
-                raise ConversionError(f"转换{current_key}时出现错误：{str(e)}") from e
-
-            if self.rep is rep_zh:
-                output_dict.update(fixed_zh_u)
-
-            if fix_dict:
-                output_dict.update(fix_dict)
-
-            return output_dict, time.time() - start_time
-
-        except Exception as e:
-            raise ConversionError(f"转换失败：{str(e)}") from e
+        return text.replace("为", "位") if key in wei and func.__name__ != "to_split" else text
 
     def segment_str(self, text: str) -> list[str]:
         """根据设置分词或者直接拆分字符串。
@@ -357,7 +476,7 @@ class ChineseConverter(BaseConverter):
         Returns:
             list[str): 分割后的字符串列表
         """
-        return jieba.lcut(text) if self.auto_cut else text.split()
+        return self.segmenter.cut(text) if self.auto_cut else text.split()
 
     def to_split(self, text: str) -> str:
         """输出拆分后的字符串结果。
@@ -455,7 +574,7 @@ class ChineseConverter(BaseConverter):
         Returns:
             str: 转换结果
         """
-        pinyin_list = lazy_pinyin(text, style=Style.TONE3, neutral_tone_with_five=True)
+        pinyin_list = char_pinyin.lazy_pinyin(text, style=Style.TONE3, neutral_tone_with_five=True)
         ipa_list = [
             f"{PINYIN_TO['ipa'].get(p[:-1], p[:-1])}{TONE_TO_IPA.get(p[-1], p[-1])}"
             for p in pinyin_list
@@ -471,7 +590,7 @@ class ChineseConverter(BaseConverter):
         Returns:
             str: 转换结果
         """
-        bpmf_list = lazy_pinyin(text, style=Style.BOPOMOFO)
+        bpmf_list = char_pinyin.lazy_pinyin(text, style=Style.BOPOMOFO)
         bpmf_list = [f"˙{i[:-1]}" if i.endswith("˙") else i for i in bpmf_list]
         return " ".join(bpmf_list)
 
@@ -561,7 +680,7 @@ class ChineseConverter(BaseConverter):
         Returns:
             str: 转换结果
         """
-        pinyin_list = lazy_pinyin(text)
+        pinyin_list = char_pinyin.lazy_pinyin(text)
         kana_list = [f"{PINYIN_TO['katakana'].get(p, p)}" for p in pinyin_list]
         return " ".join(kana_list)
 
@@ -23,4 +23,4 @@ if __name__ == "__main__":
     ]
 
     for method, output in conversions:
-        save_to_json(conv.convert(getattr(conv, method)), output, "data/fixed")
+        save_to_json(conv.convert(getattr(conv, method)), output, "data/fixed", index=False)
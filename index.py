@@ -0,0 +1,238 @@
+"""语言文件的逐键哈希索引，可快速比较两次构建的差异"""
+
+import argparse
+import hashlib
+import sys
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Final
+
+import orjson
+
+BUCKETS: Final[int] = 256  # 索引分桶数
+INDEX_FOLDER: Final[str] = "index"  # 索引相对于输出文件夹的位置
+INDEX_SUFFIX: Final[str] = ".idx"  # 索引文件的后缀
+
+type Bucket = dict[str, str]
+type Diff = tuple[list[str], list[str], list[str]]
+
+
+def _hash(data: bytes) -> str:
+    """计算短哈希。"""
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+@dataclass
+class Index:
+    """逐键哈希索引。
+
+    键名按哈希值分桶，每个桶和整个索引都带有摘要。从文件载入时仅读取摘要，
+    比较时只需读取摘要不同的桶，耗时与变动的键名数成正比。
+
+    Attributes:
+        digest (str): 整体摘要，相同即表示两份数据的键值完全相同（不含顺序）
+        count (int): 键名数
+        digests (list[str]): 各桶的摘要
+        buckets (dict[int, Bucket]): 已载入的桶，键名到值哈希的映射
+        path (Path | None): 索引文件路径，为None时所有桶均已载入
+        spans (list[tuple[int, int]]): 各桶在索引文件中的（偏移，长度）
+    """
+
+    digest: str
+    count: int
+    digests: list[str]
+    buckets: dict[int, Bucket] = field(default_factory=dict)
+    path: Path | None = None
+    spans: list[tuple[int, int]] = field(default_factory=list)
+
+    def bucket(self, i: int) -> Bucket:
+        """获取一个桶，必要时从索引文件中读取。
+
+        Args:
+            i (int): 桶序号
+
+        Returns:
+            Bucket: 键名到值哈希的映射
+        """
+        if i not in self.buckets and self.path:
+            offset, length = self.spans[i]
+            with self.path.open("rb") as f:
+                f.seek(offset)
+                self.buckets[i] = orjson.loads(f.read(length))
+        return self.buckets[i]
+
+
+def build_index(data: dict) -> Index:
+    """为语言数据构建逐键哈希索引。
+
+    Args:
+        data (dict): 语言数据
+
+    Returns:
+        Index: 哈希索引
+    """
+    buckets: list[Bucket] = [{} for _ in range(BUCKETS)]
+    for k, v in data.items():
+        key = str(k)
+        buckets[zlib.crc32(key.encode()) % BUCKETS][key] = _hash(orjson.dumps(v))
+
+    digests = [
+        _hash("\n".join(f"{k}\0{h}" for k, h in sorted(b.items())).encode()) for b in buckets
+    ]
+    return Index(_hash("".join(digests).encode()), len(data), digests, dict(enumerate(buckets)))
+
+
+def save_index(data: dict, path: Path) -> None:
+    """构建哈希索引并保存。
+
+    第一行为含摘要和各桶位置的JSON头部，其后每行为一个桶，使载入和比较时无需解析整个文件。
+
+    Args:
+        data (dict): 语言数据
+        path (Path): 索引文件路径
+    """
+    index = build_index(data)
+    lines = [orjson.dumps(index.bucket(i)) + b"\n" for i in range(BUCKETS)]
+    spans, offset = [], 0
+    for line in lines:
+        spans.append((offset, len(line) - 1))
+        offset += len(line)
+    header = orjson.dumps(
+        {"digest": index.digest, "count": index.count, "digests": index.digests, "spans": spans}
+    )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as f:
+        f.write(header + b"\n")
+        f.writelines(lines)
+
+
+def load_index(path: Path) -> Index:
+    """载入哈希索引，仅读取头部，桶在比较时按需读取。
+
+    Args:
+        path (Path): 索引文件路径
+
+    Returns:
+        Index: 哈希索引
+    """
+    with path.open("rb") as f:
+        line = f.readline()
+    header = orjson.loads(line)
+    return Index(
+        header["digest"],
+        header["count"],
+        header["digests"],
+        path=path,
+        spans=[(offset + len(line), length) for offset, length in header["spans"]],
+    )
+
+
+def diff_index(old: Index, new: Index) -> Diff:
+    """比较两个哈希索引，仅读取摘要不同的桶。
+
+    Args:
+        old (Index): 旧索引
+        new (Index): 新索引
+
+    Returns:
+        Diff: (修改的键名，新增的键名，删除的键名)
+    """
+    changed: list[str] = []
+    added: list[str] = []
+    removed: list[str] = []
+    if old.digest == new.digest:
+        return changed, added, removed
+
+    for i, (old_digest, new_digest) in enumerate(zip(old.digests, new.digests, strict=True)):
+        if old_digest == new_digest:
+            continue
+        old_keys, new_keys = old.bucket(i), new.bucket(i)
+        for k, h in new_keys.items():
+            if k not in old_keys:
+                added.append(k)
+            elif old_keys[k] != h:
+                changed.append(k)
+        removed.extend(k for k in old_keys if k not in new_keys)
+
+    return sorted(changed), sorted(added), sorted(removed)
+
+
+def _language_files(folder: Path) -> dict[str, Path]:
+    """获取输出文件夹中的语言文件，索引不旧于语言文件时使用索引。"""
+    files = {p.stem: p for p in folder.glob("*.json")}
+    for p in (folder / INDEX_FOLDER).glob(f"*{INDEX_SUFFIX}"):
+        lang_file = files.get(p.stem)
+        if lang_file is None or p.stat().st_mtime_ns >= lang_file.stat().st_mtime_ns:
+            files[p.stem] = p
+    return files
+
+
+def _open_index(path: Path) -> Index:
+    """载入索引文件，或为没有索引的语言文件构建索引。"""
+    if path.suffix == INDEX_SUFFIX:
+        return load_index(path)
+    with path.open("rb") as f:
+        return build_index(orjson.loads(f.read()))
+
+
+def diff_folders(old_folder: Path, new_folder: Path, show_keys: bool = True) -> bool:
+    """比较两个输出文件夹中的所有语言文件并输出结果。
+
+    优先使用“index”中的索引，没有索引或索引已过期的语言文件（如版本库中的输出文件夹）将即时构建索引。
+
+    Args:
+        old_folder (Path): 旧输出文件夹
+        new_folder (Path): 新输出文件夹
+        show_keys (bool, optional): 是否列出变动的键名，默认为True
+
+    Returns:
+        bool: 是否存在差异
+
+    Raises:
+        FileNotFoundError: 输出文件夹不存在
+    """
+    for folder in (old_folder, new_folder):
+        if not folder.is_dir():
+            raise FileNotFoundError(f"输出文件夹“{folder}”不存在")
+    old_files = _language_files(old_folder)
+    new_files = _language_files(new_folder)
+    different = False
+
+    for name in sorted(old_files.keys() | new_files.keys()):
+        if name not in new_files or name not in old_files:
+            print(f"{name}：仅存在于{'旧' if name in old_files else '新'}构建中")
+            different = True
+            continue
+        changed, added, removed = diff_index(
+            _open_index(old_files[name]), _open_index(new_files[name])
+        )
+        if not (changed or added or removed):
+            continue
+        different = True
+        print(f"{name}：修改{len(changed)}，新增{len(added)}，删除{len(removed)}")
+        if show_keys:
+            for mark, keys in (("~", changed), ("+", added), ("-", removed)):
+                for k in keys:
+                    print(f"  {mark} {k}")
+
+    if not different:
+        print("两次构建的输出完全相同。")
+    return different
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="比较两次构建的逐键哈希索引")
+    parser.add_argument("old", type=Path, help="旧的输出文件夹")
+    parser.add_argument("new", type=Path, nargs="?", default=Path("output"), help="新的输出文件夹")
+    parser.add_argument("--summary", action="store_true", help="仅输出各语言文件的变动数量")
+    parser.add_argument("--check", action="store_true", help="存在差异时以非零状态退出")
+    args = parser.parse_args()
+
+    try:
+        different = diff_folders(args.old, args.new, not args.summary)
+    except FileNotFoundError as e:
+        sys.exit(f"比较失败：{str(e)}。")
+    if different and args.check:
+        sys.exit(1)
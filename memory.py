@@ -0,0 +1,192 @@
+"""内存监控，记录各构建阶段的内存占用并检查内存预算"""
+
+import os
+import sys
+import threading
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MB = 1048576
+
+
+class MemoryBudgetError(Exception):
+    """内存占用超出预算"""
+
+
+def current_rss() -> int:
+    """获取当前进程的常驻内存大小。
+
+    Linux下读取/proc/self/statm，其他平台退而使用历史峰值。
+
+    Returns:
+        int: 常驻内存大小（字节），无法获取时为0
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is None:
+        return 0
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+@dataclass
+class StageMemory:
+    """单个阶段的内存统计。
+
+    Attributes:
+        name (str): 阶段名称
+        rss_start (int): 开始时的常驻内存（字节）
+        rss_end (int): 结束时的常驻内存（字节）
+        rss_peak (int): 阶段内采样到的常驻内存峰值（字节）
+        traced_peak (int): 阶段内tracemalloc记录的分配峰值（字节）
+        hotspots (list[str]): 阶段结束时分配最多的代码位置
+    """
+
+    name: str
+    rss_start: int
+    rss_end: int = 0
+    rss_peak: int = 0
+    traced_peak: int = 0
+    hotspots: list[str] = field(default_factory=list)
+
+
+class MemoryMonitor:
+    """内存监控器，按阶段采样常驻内存，可选启用tracemalloc快照。
+
+    Attributes:
+        budget (int | None): 常驻内存预算（字节），为None时不检查
+        trace (bool): 是否启用tracemalloc
+        top (int): 每个阶段记录的分配热点数
+        interval (float): 常驻内存采样间隔（秒）
+        stages (list[StageMemory]): 已完成阶段的统计
+    """
+
+    def __init__(
+        self,
+        budget_mb: float | None = None,
+        trace: bool = False,
+        top: int = 5,
+        interval: float = 0.02,
+    ) -> None:
+        """初始化内存监控器。
+
+        Args:
+            budget_mb (float | None, optional): 常驻内存预算（MB），默认不检查
+            trace (bool, optional): 是否启用tracemalloc，默认为False
+            top (int, optional): 每个阶段记录的分配热点数，默认为5
+            interval (float, optional): 常驻内存采样间隔（秒），默认为0.02
+        """
+        self.budget = int(budget_mb * MB) if budget_mb is not None else None
+        self.trace = trace
+        self.top = top
+        self.interval = interval
+        self.stages: list[StageMemory] = []
+        self._peak = 0
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._sampler: threading.Thread | None = None
+        self.startup = StageMemory("startup", current_rss())
+
+    def start(self) -> None:
+        """启动后台采样线程，如已启用则开始tracemalloc追踪。
+
+        Raises:
+            MemoryBudgetError: 启动时常驻内存已超出预算
+        """
+        if self.budget and self.startup.rss_start > self.budget:
+            raise MemoryBudgetError(
+                f"启动时常驻内存{self.startup.rss_start / MB:.1f} MB，"
+                f"超出预算{self.budget / MB:.1f} MB"
+            )
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        """停止后台采样线程和tracemalloc追踪。"""
+        self._stop.set()
+        if self._sampler:
+            self._sampler.join()
+        if self.trace and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _sample(self) -> None:
+        """后台线程：持续采样常驻内存并记录峰值。"""
+        while not self._stop.wait(self.interval):
+            rss = current_rss()
+            with self._lock:
+                self._peak = max(self._peak, rss)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageMemory]:
+        """记录一个构建阶段的内存占用，结束时检查预算。
+
+        Args:
+            name (str): 阶段名称
+
+        Yields:
+            StageMemory: 该阶段的统计，阶段结束后填充完毕
+
+        Raises:
+            MemoryBudgetError: 阶段内常驻内存峰值超出预算
+        """
+        stats = StageMemory(name, current_rss())
+        with self._lock:
+            self._peak = stats.rss_start
+        if self.trace:
+            tracemalloc.reset_peak()
+
+        yield stats
+
+        stats.rss_end = current_rss()
+        with self._lock:
+            stats.rss_peak = max(self._peak, stats.rss_end)
+        if self.trace:
+            stats.traced_peak = tracemalloc.get_traced_memory()[1]
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [
+                    tracemalloc.Filter(False, f)
+                    for f in (tracemalloc.__file__, threading.__file__, __file__)
+                ]
+            )
+            stats.hotspots = [str(s) for s in snapshot.statistics("lineno")[: self.top]]
+        self.stages.append(stats)
+
+        if self.budget and stats.rss_peak > self.budget:
+            raise MemoryBudgetError(
+                f"阶段“{name}”内存峰值{stats.rss_peak / MB:.1f} MB，"
+                f"超出预算{self.budget / MB:.1f} MB"
+            )
+
+    def report(self) -> str:
+        """生成各阶段内存占用的报告。
+
+        Returns:
+            str: 报告文本
+        """
+        lines = [f"启动时常驻内存{self.startup.rss_start / MB:.1f} MB。"]
+        for s in self.stages:
+            line = (
+                f"阶段“{s.name}”：常驻内存峰值{s.rss_peak / MB:.1f} MB，"
+                f"结束时{s.rss_end / MB:.1f} MB（{(s.rss_end - s.rss_start) / MB:+.1f} MB）"
+            )
+            if self.trace:
+                line += f"，分配峰值{s.traced_peak / MB:.1f} MB"
+            lines.append(f"{line}。")
+            lines.extend(f"    {h}" for h in s.hotspots)
+        if self.stages:
+            peak = max(s.rss_peak for s in self.stages)
+            lines.append(f"整体常驻内存峰值{peak / MB:.1f} MB。")
+        return "\n".join(lines)
@@ -1,11 +1,19 @@
 """Minecraft难视语言资源包生成器"""
 
+import argparse
+import math
+import re
+import sys
 import time
 import zipfile as zf
+from contextlib import AbstractContextManager, nullcontext
+from pathlib import Path
 from typing import Final
 
-from base import DATA, Ldata, P, file_size, fixed_zh, save_to_json
+from base import DATA, LANG_FILES, Ldata, P, file_size, fixed_zh, load_json, save_to_json
 from converter import ChineseConverter, EnglishConverter
+from memory import MemoryBudgetError, MemoryMonitor
+from segment import SEGMENTERS, get_segmenter
 
 # 语言文件配置
 LANG_CONVERSIONS: Final[list[tuple[str, str, Ldata | None]]] = [
@@ -29,48 +37,340 @@ LANG_CONVERSIONS: Final[list[tuple[str, str, Ldata | None]]] = [
 ]
 
 
-def generate_language_files() -> float:
+def memory_stage(monitor: MemoryMonitor | None, name: str) -> AbstractContextManager:
+    """获取记录内存占用的构建阶段，未启用内存监控时不做任何事。
+
+    Args:
+        monitor (MemoryMonitor | None): 内存监控器
+        name (str): 阶段名称
+
+    Returns:
+        AbstractContextManager: 阶段上下文管理器
+    """
+    return monitor.stage(name) if monitor else nullcontext()
+
+
+def generate_language_files(
+    monitor: MemoryMonitor | None = None, segmenter: str = "jieba"
+) -> float:
     """生成所有语言文件。
 
+    Args:
+        monitor (MemoryMonitor | None, optional): 内存监控器，转换器和分词器的创建作为“setup”阶段，
+            每个语言文件作为一个阶段
+        segmenter (str, optional): 分词器名称，默认为“jieba”
+
     Returns:
         float: 生成耗时（秒）
     """
     start_time = time.time()
-    en_conv = EnglishConverter(DATA["en_us"])
-    zh_conv = ChineseConverter(DATA["zh_cn"])
+    with memory_stage(monitor, "setup"):
+        en_conv = EnglishConverter(DATA["en_us"])
+        zh_conv = ChineseConverter(DATA["zh_cn"], segmenter=get_segmenter(segmenter))
 
     for method, output, fix_dict in LANG_CONVERSIONS:
         if output.startswith(("en_", "ja_")):
             conv = en_conv
         else:
             conv = zh_conv
-        save_to_json(conv.convert(getattr(conv, method), fix_dict), output)
+        with memory_stage(monitor, output):
+            # 在阶段内保持对结果的引用，使分配热点包含转换结果
+            result = conv.convert(getattr(conv, method), fix_dict)
+            save_to_json(result, output)
 
     return time.time() - start_time
 
 
-def create_resource_pack() -> tuple[str, float]:
+def generate_multi_version(versions: dict[str, str], segmenter: str = "jieba") -> float:
+    """为多个游戏版本生成语言文件，各版本间相同的字符串只转换一次。
+
+    Args:
+        versions (dict[str, str]): 版本号到其语言文件所在文件夹的映射
+        segmenter (str, optional): 分词器名称，默认为“jieba”
+
+    Returns:
+        float: 生成耗时（秒）
+    """
+    start_time = time.time()
+    converters: dict[str, tuple[EnglishConverter, ChineseConverter]] = {}
+    shared_segmenter = get_segmenter(segmenter)
+    for version, folder in versions.items():
+        data = {lang_name: load_json(lang_name, folder) for lang_name in LANG_FILES}
+        converters[version] = (
+            EnglishConverter(data["en_us"]),
+            ChineseConverter(data["zh_cn"], segmenter=shared_segmenter),
+        )
+
+    total, unique = 0, 0
+    for method, output, fix_dict in LANG_CONVERSIONS:
+        memo: Ldata = {}
+        for version, (en_conv, zh_conv) in converters.items():
+            conv = en_conv if output.startswith(("en_", "ja_")) else zh_conv
+            conv_start = time.time()
+            output_dict = conv.apply_fixes(
+                conv.convert_items(getattr(conv, method), memo=memo), fix_dict
+            )
+            save_to_json((output_dict, time.time() - conv_start), output, f"output/{version}")
+            total += len(conv.data)
+        unique += len(memo)
+
+    print(
+        f"\n{len(versions)}个版本共{total}条字符串，去重后实际转换{unique}条，"
+        f"节省{1 - unique / total:.1%}的转换。"
+    )
+    return time.time() - start_time
+
+
+def create_resource_pack(
+    output_folder: str = "output",
+    pack_name: str = "unreadable_language_pack",
+) -> tuple[str, float]:
     """将生成的语言文件和必要的资源打包为Minecraft资源包。
 
+    Args:
+        output_folder (str, optional): 语言文件所在文件夹，默认为“output”
+        pack_name (str, optional): 资源包文件名，无格式后缀，默认为“unreadable_language_pack”
+
     Returns:
         tuple[str, float]: (资源包大小，打包耗时)
     """
     start_time = time.time()
-    pack_path = P / "unreadable_language_pack.zip"
+    pack_path = P / f"{pack_name}.zip"
+
+    def write(z: zf.ZipFile, path: Path, arcname: str) -> None:
+        """以固定的时间戳和权限写入文件，使相同的输入总是生成相同的资源包。"""
+        info = zf.ZipInfo(arcname, date_time=(1980, 1, 1, 0, 0, 0))
+        info.compress_type = zf.ZIP_DEFLATED
+        info.external_attr = 0o644 << 16
+        z.writestr(info, path.read_bytes(), compresslevel=9)
 
     with zf.ZipFile(pack_path, "w", compression=zf.ZIP_DEFLATED, compresslevel=9) as z:
-        z.write(P / "pack.mcmeta", arcname="pack.mcmeta")
-        z.write(P / "pack.png", arcname="pack.png")
-        for lang_file in P.glob("output/*.json"):
+        write(z, P / "pack.mcmeta", "pack.mcmeta")
+        write(z, P / "pack.png", "pack.png")
+        for lang_file in sorted(P.glob(f"{output_folder}/*.json")):
             if lang_file != "zh_split.json":
-                z.write(lang_file, arcname=f"assets/minecraft/lang/{lang_file.name}")
+                write(z, lang_file, f"assets/minecraft/lang/{lang_file.name}")
 
     return file_size(pack_path), time.time() - start_time
 
 
+def parse_version(value: str) -> tuple[str, str]:
+    """解析“VERSION=FOLDER”形式的版本参数。
+
+    版本号将用作输出文件夹和资源包的文件名，只能是以字母或数字开头的单个路径组成部分。
+
+    Args:
+        value (str): 版本参数
+
+    Returns:
+        tuple[str, str]: (版本号，语言文件所在文件夹)
+
+    Raises:
+        argparse.ArgumentTypeError: 格式错误，版本号不合法，或文件夹中缺少语言文件
+    """
+    version, sep, folder = value.partition("=")
+    if not sep or not version or not folder:
+        raise argparse.ArgumentTypeError(f"“{value}”不是“VERSION=FOLDER”的形式")
+    if not re.fullmatch(r"[0-9A-Za-z][0-9A-Za-z._+-]*", version):
+        raise argparse.ArgumentTypeError(
+            f"版本号“{version}”只能含有字母、数字和“.”、“_”、“+”、“-”，且须以字母或数字开头"
+        )
+    missing = [f"{name}.json" for name in LANG_FILES if not (P / folder / f"{name}.json").is_file()]
+    if missing:
+        raise argparse.ArgumentTypeError(f"文件夹“{folder}”中缺少{'、'.join(missing)}")
+    return version, folder
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """解析“i/N”形式的分片编号。
+
+    Args:
+        value (str): 分片编号，i从0开始
+
+    Returns:
+        tuple[int, int]: (分片序号，分片总数)
+
+    Raises:
+        argparse.ArgumentTypeError: 格式错误、分片总数不是正数或序号超出范围
+    """
+    try:
+        index, count = (int(x) for x in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"“{value}”不是“i/N”的形式") from None
+    if count <= 0:
+        raise argparse.ArgumentTypeError("分片总数必须大于0")
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"分片序号{index}超出范围0~{count - 1}")
+    return index, count
+
+
+def parse_shard_count(value: str) -> int:
+    """解析分片总数。
+
+    Args:
+        value (str): 分片总数
+
+    Returns:
+        int: 分片总数
+
+    Raises:
+        argparse.ArgumentTypeError: 不是正整数
+    """
+    try:
+        count = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"“{value}”不是整数") from None
+    if count <= 0:
+        raise argparse.ArgumentTypeError("分片总数必须大于0")
+    return count
+
+
+def parse_memory_budget(value: str) -> float:
+    """解析内存预算。
+
+    Args:
+        value (str): 内存预算（MB）
+
+    Returns:
+        float: 内存预算（MB）
+
+    Raises:
+        argparse.ArgumentTypeError: 不是有限的正数
+    """
+    try:
+        budget = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"“{value}”不是数字") from None
+    if not 0 < budget < math.inf:
+        raise argparse.ArgumentTypeError("内存预算必须是大于0的有限数")
+    return budget
+
+
+def parse_args() -> argparse.Namespace:
+    """解析命令行参数。
+
+    Returns:
+        argparse.Namespace: 命令行参数
+    """
+    parser = argparse.ArgumentParser(description="Minecraft难视语言资源包生成器")
+    mode_group = parser.add_mutually_exclusive_group()  # 监视、分片、合并和多版本模式只能选择一种
+    mode_group.add_argument(
+        "--watch",
+        action="store_true",
+        help="监视模式：常驻内存，数据文件变动时仅重新生成受影响的语言文件",
+    )
+    parser.add_argument(
+        "--interval", type=float, default=0.5, help="监视模式的轮询间隔（秒），默认为0.5"
+    )
+    parser.add_argument(
+        "--segmenter",
+        choices=SEGMENTERS,
+        default="jieba",
+        help="分词器：jieba或基于前缀树的快速分词器trie，默认为jieba",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=parse_memory_budget,
+        metavar="MB",
+        help="常驻内存预算（MB），任一阶段超出时构建失败，启用内存监控",
+    )
+    parser.add_argument(
+        "--memory-report", action="store_true", help="启用内存监控并输出各阶段的内存占用"
+    )
+    parser.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        help="启用tracemalloc，报告各阶段的分配峰值和分配热点，会明显减慢构建",
+    )
+    mode_group.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="i/N",
+        help="分片模式：仅转换第i个分片（从0开始，共N个）的键名，将部分结果保存至分片文件夹",
+    )
+    mode_group.add_argument(
+        "--merge",
+        type=parse_shard_count,
+        metavar="N",
+        help="合并分片文件夹中的N个分片，生成语言文件并打包",
+    )
+    parser.add_argument(
+        "--shard-dir", default="shards", help="分片文件夹，可为多台机器共享，默认为“shards”"
+    )
+    mode_group.add_argument(
+        "--versions",
+        nargs="+",
+        type=parse_version,
+        metavar="VERSION=FOLDER",
+        help="多版本模式：为各版本分别生成语言文件和资源包，FOLDER为含en_us.json和zh_cn.json的文件夹",
+    )
+    args = parser.parse_args()
+
+    if args.versions:
+        versions = [version for version, _ in args.versions]
+        if duplicate := next((v for v in versions if versions.count(v) > 1), None):
+            parser.error(f"版本号“{duplicate}”重复")
+    if args.memory_budget is not None or args.memory_report or args.tracemalloc:
+        modes = {
+            "--watch": args.watch,
+            "--shard": args.shard is not None,
+            "--merge": args.merge is not None,
+            "--versions": args.versions,
+        }
+        if mode := next((m for m, on in modes.items() if on), None):
+            parser.error(f"内存监控仅支持完整构建，不能与{mode}同时使用")
+    return args
+
+
 if __name__ == "__main__":
-    gen_time = generate_language_files()
-    print(f"\n语言文件生成完毕，共耗时{gen_time:.2f} s。")
+    args = parse_args()
+    if args.watch:
+        from watch import LanguageFileWatcher
+
+        LanguageFileWatcher(args.segmenter).watch(args.interval)
+    elif args.shard is not None:
+        from shard import generate_shard
+
+        index, count = args.shard
+        gen_time = generate_shard(index, count, args.shard_dir, args.segmenter)
+        print(f"\n分片{index}/{count}生成完毕，共耗时{gen_time:.2f} s。")
+    elif args.merge is not None:
+        from shard import ShardError, merge_shards
+
+        try:
+            merge_time = merge_shards(args.merge, args.shard_dir, args.segmenter)
+        except ShardError as e:
+            sys.exit(f"合并失败：{str(e)}。")
+        print(f"\n分片合并完毕，共耗时{merge_time:.2f} s。")
+
+        pack_size, zip_time = create_resource_pack()
+        print(f"\n资源包打包完毕，大小{pack_size}，打包耗时{zip_time:.2f} s。")
+    elif args.versions:
+        versions = dict(args.versions)
+        gen_time = generate_multi_version(versions, args.segmenter)
+        print(f"\n语言文件生成完毕，共耗时{gen_time:.2f} s。")
+
+        for version in versions:
+            pack_size, zip_time = create_resource_pack(
+                f"output/{version}", f"unreadable_language_pack_{version}"
+            )
+            print(f"\n{version}版本资源包打包完毕，大小{pack_size}，打包耗时{zip_time:.2f} s。")
+    else:
+        monitor = None
+        if args.memory_budget is not None or args.memory_report or args.tracemalloc:
+            monitor = MemoryMonitor(args.memory_budget, args.tracemalloc)
+        try:
+            if monitor:
+                monitor.start()
+            gen_time = generate_language_files(monitor, args.segmenter)
+            print(f"\n语言文件生成完毕，共耗时{gen_time:.2f} s。")
 
-    pack_size, zip_time = create_resource_pack()
-    print(f"\n资源包打包完毕，大小{pack_size}，打包耗时{zip_time:.2f} s。")
+            with memory_stage(monitor, "pack"):
+                pack_size, zip_time = create_resource_pack()
+            print(f"\n资源包打包完毕，大小{pack_size}，打包耗时{zip_time:.2f} s。")
+        except MemoryBudgetError as e:
+            sys.exit(f"\n构建失败：{str(e)}。")
+        finally:
+            if monitor:
+                monitor.stop()
+                print(f"\n{monitor.report()}")
@@ -0,0 +1,402 @@
+"""分词后端，提供jieba分词和基于前缀树的快速分词，并可比较二者的结果"""
+
+import argparse
+import math
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from functools import cache
+from pathlib import Path
+from typing import Final
+
+import jieba
+
+from base import P
+from memory import MB, current_rss
+
+USER_DICT: Final[Path] = P / "data" / "dict.txt"
+
+
+type UserDict = dict[str, tuple[str | None, str | None]]
+
+
+def read_user_dict(path: Path = USER_DICT) -> UserDict:
+    """按照jieba的规则读取自定义词典。
+
+    Args:
+        path (Path, optional): 自定义词典路径，默认为“data/dict.txt”
+
+    Returns:
+        UserDict: 词语到（词频，词性）的映射
+    """
+    words: UserDict = {}
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            line = line.strip().lstrip("\ufeff")
+            if not line:
+                continue
+            word, freq, tag = jieba.re_userdict.match(line).groups()
+            words[word] = (freq and freq.strip(), tag and tag.strip())
+    return words
+
+
+# jieba的词典为全局状态，故在模块中记录被自定义词语及其前缀覆盖前的词频（None表示原本不在词典中）
+# 和载入自定义词典前的词频总和
+_jieba_base: dict[str, int | None] = {}
+_jieba_base_total: int | None = None
+
+
+def _restore_freq(freq: dict[str, int], base: dict[str, int | None]) -> None:
+    """将词频表中被覆盖的词语恢复为原有词频。"""
+    for word, f in base.items():
+        if f is None:
+            freq.pop(word, None)
+        else:
+            freq[word] = f
+
+
+def _snapshot_freq(freq: dict[str, int], base: dict[str, int | None], words: UserDict) -> None:
+    """记录自定义词语及其前缀被覆盖前的词频。"""
+    for word in words:
+        for i in range(1, len(word) + 1):
+            base.setdefault(word[:i], freq.get(word[:i]))
+
+
+def _changed_words(before: dict[str, int | None], freq: dict[str, int]) -> set[str]:
+    """获取词频发生变化的词语。"""
+    return {w for w, f in before.items() if freq.get(w) != f}
+
+
+def load_jieba_user_dict(path: Path = USER_DICT) -> set[str]:
+    """载入jieba自定义词典，替换之前载入的自定义词语。
+
+    先将之前的自定义词语恢复为jieba默认词典中的词频，再使用jieba.load_userdict载入，
+    结果与在新的进程中载入该词典相同。jieba.del_word会强制拆分词语，使HMM也无法识别出它，因此不能用于删除。
+
+    Args:
+        path (Path, optional): 自定义词典路径，默认为“data/dict.txt”
+
+    Returns:
+        set[str]: 词频发生变化的词语
+    """
+    global _jieba_base_total
+    dt = jieba.dt
+    dt.check_initialized()
+    words = read_user_dict(path)
+    if _jieba_base_total is None:
+        _jieba_base_total = dt.total
+    _snapshot_freq(dt.FREQ, _jieba_base, words)
+    before = {w: dt.FREQ.get(w) for w in _jieba_base}
+
+    _restore_freq(dt.FREQ, _jieba_base)
+    dt.total = _jieba_base_total
+    jieba.finalseg.Force_Split_Words.difference_update(_jieba_base)
+    jieba.load_userdict(str(path))
+    return _changed_words(before, dt.FREQ)
+
+
+@cache
+def init_jieba() -> None:
+    """载入jieba自定义词典，仅在首次调用时执行。"""
+    load_jieba_user_dict()
+
+
+class Segmenter(ABC):
+    """分词器基类。"""
+
+    @abstractmethod
+    def cut(self, text: str) -> list[str]:
+        """分词。
+
+        Args:
+            text (str): 需要分词的字符串
+
+        Returns:
+            list[str]: 分词结果
+        """
+
+    @abstractmethod
+    def load_user_dict(self, path: Path = USER_DICT) -> set[str]:
+        """重新载入自定义词典，结果与使用该词典重新创建分词器相同。
+
+        Args:
+            path (Path, optional): 自定义词典路径，默认为“data/dict.txt”
+
+        Returns:
+            set[str]: 词频发生变化的词语
+        """
+
+
+class JiebaSegmenter(Segmenter):
+    """使用jieba精确模式和HMM的分词器。"""
+
+    def __init__(self) -> None:
+        """初始化分词器，载入jieba自定义词典。"""
+        init_jieba()
+
+    def cut(self, text: str) -> list[str]:
+        """分词。
+
+        Args:
+            text (str): 需要分词的字符串
+
+        Returns:
+            list[str]: 分词结果
+        """
+        return jieba.lcut(text)
+
+    def load_user_dict(self, path: Path = USER_DICT) -> set[str]:
+        """重新载入自定义词典，结果与使用该词典重新创建分词器相同。
+
+        Args:
+            path (Path, optional): 自定义词典路径，默认为“data/dict.txt”
+
+        Returns:
+            set[str]: 词频发生变化的词语
+        """
+        return load_jieba_user_dict(path)
+
+
+class TrieSegmenter(Segmenter):
+    """基于前缀词典和动态规划的确定性分词器。
+
+    前缀词典与jieba相同，是扁平化的前缀树：词语映射到词频，词语的各个前缀映射到0。
+    选取概率最大的切分路径，不识别词典外的新词。非汉字部分的处理与jieba一致。
+
+    Attributes:
+        freq (dict[str, int]): 词语到词频的映射，词语的前缀词频为0
+        total (int): 词频总和
+        base (dict[str, int | None]): 被自定义词语及其前缀覆盖前的词频，None表示原本不在词典中
+        base_total (int): 载入自定义词典前的词频总和
+    """
+
+    def __init__(self, freq: dict[str, int], total: int) -> None:
+        """由前缀词典初始化分词器。
+
+        Args:
+            freq (dict[str, int]): 前缀词典，格式与jieba.Tokenizer.gen_pfdict的结果相同
+            total (int): 词频总和
+        """
+        self.freq = freq
+        self.total = total
+        self.base: dict[str, int | None] = {}
+        self.base_total = total
+
+    @classmethod
+    def from_files(
+        cls, freq_file: Path | None = None, user_dict: Path | None = USER_DICT
+    ) -> "TrieSegmenter":
+        """由词频表文件和自定义词典构建分词器，文件格式与jieba词典相同。
+
+        Args:
+            freq_file (Path | None, optional): 词频表文件，默认为jieba自带的词典
+            user_dict (Path | None, optional): 自定义词典，默认为“data/dict.txt”
+
+        Returns:
+            TrieSegmenter: 分词器
+        """
+        f = freq_file.open("rb") if freq_file else jieba.dt.get_dict_file()
+        segmenter = cls(*jieba.Tokenizer.gen_pfdict(f))
+
+        if user_dict:
+            segmenter.load_user_dict(user_dict)
+        return segmenter
+
+    def load_user_dict(self, path: Path = USER_DICT) -> set[str]:
+        """重新载入自定义词典，结果与使用该词典重新创建分词器相同。
+
+        Args:
+            path (Path, optional): 自定义词典路径，默认为“data/dict.txt”
+
+        Returns:
+            set[str]: 词频发生变化的词语
+        """
+        words = read_user_dict(path)
+        _snapshot_freq(self.freq, self.base, words)
+        before = {w: self.freq.get(w) for w in self.base}
+
+        _restore_freq(self.freq, self.base)
+        self.total = self.base_total
+        for word, (count, _) in words.items():
+            self.add_word(word, int(count) if count else None)
+        return _changed_words(before, self.freq)
+
+    def _set_freq(self, word: str, freq: int) -> None:
+        """设置词语的词频，并补充其前缀。"""
+        self.total += freq - self.freq.get(word, 0)
+        self.freq[word] = freq
+        for i in range(1, len(word)):
+            self.freq.setdefault(word[:i], 0)
+
+    def add_word(self, word: str, freq: int | None = None) -> None:
+        """添加词语或修改其词频。
+
+        Args:
+            word (str): 词语
+            freq (int | None, optional): 词频，默认为恰好能使该词被切分出来的词频
+        """
+        if freq is None:
+            # 与jieba.suggest_freq(word, False)相同
+            p = 1.0
+            for seg in self.cut(word):
+                p *= self.freq.get(seg, 1) / self.total
+            freq = max(int(p * self.total) + 1, self.freq.get(word, 1))
+        self._set_freq(word, freq)
+
+    def cut_han(self, text: str) -> list[str]:
+        """对汉字和字母数字组成的片段进行分词。
+
+        Args:
+            text (str): 需要分词的片段
+
+        Returns:
+            list[str]: 分词结果
+        """
+        n = len(text)
+        log = math.log
+        log_total = log(self.total)
+        freq = self.freq
+        route = [0.0] * (n + 1)
+        ends = list(range(1, n + 2))
+
+        for k in range(n - 1, -1, -1):
+            best, best_end = -math.inf, k + 1
+            i = k + 1
+            f = freq.get(text[k])
+            while f is not None:
+                if f:
+                    score = log(f) - log_total + route[i]
+                    if score >= best:
+                        best, best_end = score, i
+                if i == n:
+                    break
+                i += 1
+                f = freq.get(text[k:i])
+            if best == -math.inf:  # 词典中没有以该字开头的词语
+                best = route[k + 1] - log_total
+            route[k], ends[k] = best, best_end
+
+        result: list[str] = []
+        buf = ""
+        x = 0
+        while x < n:
+            y = ends[x]
+            word = text[x:y]
+            if y - x == 1 and jieba.re_eng.match(word):
+                buf += word
+            else:
+                if buf:
+                    result.append(buf)
+                    buf = ""
+                result.append(word)
+            x = y
+        if buf:
+            result.append(buf)
+        return result
+
+    def cut(self, text: str) -> list[str]:
+        """分词。
+
+        Args:
+            text (str): 需要分词的字符串
+
+        Returns:
+            list[str]: 分词结果
+        """
+        result: list[str] = []
+        for block in jieba.re_han_default.split(text):
+            if not block:
+                continue
+            if jieba.re_han_default.match(block):
+                result.extend(self.cut_han(block))
+                continue
+            for part in jieba.re_skip_default.split(block):
+                if jieba.re_skip_default.match(part):
+                    result.append(part)
+                else:
+                    result.extend(part)
+        return result
+
+
+# 分词器名称与其构建函数
+SEGMENTERS: Final[dict[str, Callable[[], Segmenter]]] = {
+    "jieba": JiebaSegmenter,
+    "trie": TrieSegmenter.from_files,
+}
+
+
+def get_segmenter(name: str) -> Segmenter:
+    """根据名称创建分词器。
+
+    Args:
+        name (str): 分词器名称
+
+    Returns:
+        Segmenter: 分词器
+    """
+    return SEGMENTERS[name]()
+
+
+def compare(samples: int = 10) -> None:
+    """在完整语料上比较jieba和前缀树分词器的速度、内存占用及一致性，包括汉语拼音的转换结果。
+
+    Args:
+        samples (int, optional): 输出的不一致示例数，默认为10
+    """
+    from base import DATA
+    from converter import ChineseConverter
+
+    data = DATA["zh_cn"]
+    texts = list(data.values())
+    results: dict[str, list[list[str]]] = {}
+    pinyin: dict[str, dict[str, str]] = {}
+
+    for name in SEGMENTERS:
+        start_time = time.time()
+        rss_start = current_rss()
+        segmenter = get_segmenter(name)
+        segmenter.cut("初始化")
+        print(
+            f"{name}：初始化耗时{time.time() - start_time:.2f} s，"
+            f"常驻内存增加{(current_rss() - rss_start) / MB:.1f} MB。"
+        )
+
+        start_time = time.time()
+        results[name] = [segmenter.cut(t) for t in texts]
+        elapsed_time = time.time() - start_time
+        print(f"{name}：分词{len(texts)}条字符串耗时{elapsed_time:.2f} s。")
+
+        conv = ChineseConverter(data, segmenter=segmenter)
+        start_time = time.time()
+        pinyin[name] = conv.convert_items(conv.to_pinyin)
+        print(f"{name}：转换汉语拼音耗时{time.time() - start_time:.2f} s。")
+
+    base, fast = results["jieba"], results["trie"]
+    same = sum(a == b for a, b in zip(base, fast, strict=True))
+    tokens = sum(len(a) for a in base)
+    common = sum(len(set(_spans(a)) & set(_spans(b))) for a, b in zip(base, fast, strict=True))
+    py_same = sum(pinyin["jieba"][k] == pinyin["trie"][k] for k in data)
+
+    print(f"\n分词完全一致：{same}/{len(texts)}（{same / len(texts):.2%}）")
+    print(f"词语一致：{common}/{tokens}（{common / tokens:.2%}）")
+    print(f"汉语拼音一致：{py_same}/{len(data)}（{py_same / len(data):.2%}）")
+
+    diffs = [(a, b) for a, b in zip(base, fast, strict=True) if a != b][:samples]
+    for a, b in diffs:
+        print(f"  jieba：{' '.join(a)}\n  trie： {' '.join(b)}")
+
+
+def _spans(words: list[str]) -> list[tuple[int, int]]:
+    """将分词结果转换为各词语在原字符串中的区间。"""
+    spans = []
+    start = 0
+    for w in words:
+        spans.append((start, start + len(w)))
+        start += len(w)
+    return spans
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="比较jieba和前缀树分词器")
+    parser.add_argument("--samples", type=int, default=10, help="输出的不一致示例数，默认为10")
+    compare(parser.parse_args().samples)
@@ -0,0 +1,174 @@
+"""分片构建，按键名的稳定哈希将语言数据分配到多台机器上转换，再合并为完整的语言文件"""
+
+import hashlib
+import time
+import zlib
+from pathlib import Path
+
+import orjson
+
+from base import DATA, Ldata, P, save_to_json
+from converter import BaseConverter, ChineseConverter, EnglishConverter
+from pack import LANG_CONVERSIONS
+from segment import get_segmenter
+
+
+class ShardError(Exception):
+    """分片数据缺失或不一致"""
+
+
+def shard_of(key: str, count: int) -> int:
+    """计算键名所属的分片，结果与机器和进程无关。
+
+    Args:
+        key (str): 键名
+        count (int): 分片总数
+
+    Returns:
+        int: 分片序号
+    """
+    return zlib.crc32(key.encode()) % count
+
+
+def source_digest(data: Ldata) -> str:
+    """计算语言数据的摘要，用于确认各分片使用相同的输入。
+
+    Args:
+        data (Ldata): 语言数据
+
+    Returns:
+        str: 摘要
+    """
+    return hashlib.blake2b(orjson.dumps(data), digest_size=16).hexdigest()
+
+
+def inputs_digest(folder: Path = P / "data") -> str:
+    """计算转换所用数据文件的摘要，用于确认各分片使用相同的映射表、词典和替换规则。
+
+    修正文件在合并时应用，不计入摘要。
+
+    Args:
+        folder (Path, optional): 数据文件夹，默认为“data”
+
+    Returns:
+        str: 摘要
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for path in sorted(folder.rglob("*")):
+        name = path.relative_to(folder).as_posix()
+        if path.is_file() and not name.startswith("fixed/"):
+            content = path.read_bytes()
+            h.update(f"{name}\0{len(content)}\0".encode())
+            h.update(content)
+    return h.hexdigest()
+
+
+def _source_digests() -> dict[str, str]:
+    """计算英文和中文语言数据的摘要。"""
+    return {lang: source_digest(DATA[lang]) for lang in ("en_us", "zh_cn")}
+
+
+def _lang_of(output: str) -> str:
+    """获取输出文件对应的源语言。"""
+    return "en_us" if output.startswith(("en_", "ja_")) else "zh_cn"
+
+
+def _shard_path(folder: Path, output: str, index: int, count: int) -> Path:
+    """获取分片文件的路径。"""
+    return folder / f"{output}.{index}-of-{count}.json"
+
+
+def generate_shard(
+    index: int, count: int, folder: str = "shards", segmenter: str = "jieba"
+) -> float:
+    """转换属于指定分片的键名，为每个语言文件保存未应用修正的部分结果。
+
+    Args:
+        index (int): 分片序号
+        count (int): 分片总数
+        folder (str, optional): 分片文件夹，可为多台机器共享，默认为“shards”
+        segmenter (str, optional): 分词器名称，默认为“jieba”
+
+    Returns:
+        float: 生成耗时（秒）
+    """
+    start_time = time.time()
+    shard_folder = P / folder
+    shard_folder.mkdir(parents=True, exist_ok=True)
+    convs: dict[str, BaseConverter] = {
+        "en_us": EnglishConverter(DATA["en_us"]),
+        "zh_cn": ChineseConverter(DATA["zh_cn"], segmenter=get_segmenter(segmenter)),
+    }
+    digests = _source_digests()
+    inputs = inputs_digest()
+
+    for method, output, _ in LANG_CONVERSIONS:
+        conv = convs[_lang_of(output)]
+        keys = [k for k in conv.data if shard_of(k, count) == index]
+        shard = {
+            "source": digests[_lang_of(output)],
+            "inputs": inputs,
+            "segmenter": segmenter,
+            "data": conv.convert_items(getattr(conv, method), keys),
+        }
+        path = _shard_path(shard_folder, output, index, count)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(orjson.dumps(shard))
+        tmp_path.replace(path)  # 共享文件夹中其他进程只会看到完整的文件
+        print(f"已生成分片“{path.name}”，共{len(keys)}条。")
+
+    return time.time() - start_time
+
+
+def merge_shards(count: int, folder: str = "shards", segmenter: str = "jieba") -> float:
+    """合并所有分片，应用修正并生成与完整构建相同的语言文件。
+
+    Args:
+        count (int): 分片总数
+        folder (str, optional): 分片文件夹，默认为“shards”
+        segmenter (str, optional): 分片应使用的分词器名称，默认为“jieba”
+
+    Returns:
+        float: 合并耗时（秒）
+
+    Raises:
+        ShardError: 分片缺失、语言文件、数据文件或分词器不一致或键名不完整
+    """
+    start_time = time.time()
+    shard_folder = P / folder
+    # 合并时只需应用修正，中文转换器不会创建分词器
+    convs: dict[str, BaseConverter] = {
+        "en_us": EnglishConverter(DATA["en_us"]),
+        "zh_cn": ChineseConverter(DATA["zh_cn"]),
+    }
+    digests = _source_digests()
+    inputs = inputs_digest()
+
+    for _, output, fix_dict in LANG_CONVERSIONS:
+        merge_start = time.time()
+        conv = convs[_lang_of(output)]
+        merged: Ldata = {}
+        for index in range(count):
+            path = _shard_path(shard_folder, output, index, count)
+            if not path.exists():
+                raise ShardError(f"缺少分片“{path.name}”")
+            shard = orjson.loads(path.read_bytes())
+            if shard["source"] != digests[_lang_of(output)]:
+                raise ShardError(f"分片“{path.name}”使用的语言文件与本机不同")
+            if shard.get("inputs") != inputs:
+                raise ShardError(f"分片“{path.name}”使用的数据文件与本机不同")
+            if shard.get("segmenter") != segmenter:
+                raise ShardError(
+                    f"分片“{path.name}”使用的分词器{shard.get('segmenter')}与指定的{segmenter}不同"
+                )
+            merged.update(shard["data"])
+
+        if merged.keys() != conv.data.keys():
+            missing = len(conv.data.keys() - merged.keys())
+            extra = len(merged.keys() - conv.data.keys())
+            raise ShardError(f"“{output}”的分片与语言文件不一致，缺少{missing}条，多出{extra}条")
+
+        output_dict = conv.apply_fixes({k: merged[k] for k in conv.data}, fix_dict)
+        save_to_json((output_dict, time.time() - merge_start), output)
+
+    return time.time() - start_time
@@ -0,0 +1,181 @@
+"""流式转换脚本，从标准输入或JSONL文件逐批读取记录并转换"""
+
+import argparse
+import os
+import sys
+import time
+from collections.abc import Iterator
+from itertools import batched
+from typing import BinaryIO
+
+import orjson
+
+from converter import BaseConverter, ChineseConverter, ConversionError, EnglishConverter
+
+
+class StreamError(Exception):
+    """流式转换中断
+
+    Attributes:
+        count (int): 中断前已写出的记录数
+    """
+
+    def __init__(self, message: str, count: int) -> None:
+        """初始化异常。
+
+        Args:
+            message (str): 错误信息
+            count (int): 中断前已写出的记录数
+        """
+        super().__init__(message)
+        self.count = count
+
+
+def read_records(f: BinaryIO, batch_size: int) -> Iterator[tuple[dict, ...]]:
+    """从JSONL流中按批读取记录。
+
+    每条记录为一个含有“key”和“text”字段的JSON对象，空行将被跳过。
+
+    Args:
+        f (BinaryIO): 输入流
+        batch_size (int): 每批的记录数
+
+    Returns:
+        Iterator[tuple[dict, ...]]: 逐批记录的迭代器
+
+    Raises:
+        ConversionError: 某行不是有效的JSON
+    """
+
+    def records() -> Iterator[dict]:
+        """逐行解析记录，出错时给出行号。"""
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                raise ConversionError(f"第{line_no}行不是有效的JSON：{str(e)}") from e
+
+    return batched(records(), batch_size)
+
+
+def convert_stream(
+    conv: BaseConverter,
+    method: str,
+    input_file: BinaryIO,
+    output_file: BinaryIO,
+    batch_size: int = 1000,
+) -> int:
+    """流式转换记录，每批转换完毕后立即写出。
+
+    读取下一批前会先写出并刷新当前批次，下游消费缓慢时写入将阻塞读取，
+    因此内存占用仅与批大小有关，与输入总量无关。不应用修正数据。
+
+    Args:
+        conv (BaseConverter): 转换器
+        method (str): 转换方法名
+        input_file (BinaryIO): 输入流
+        output_file (BinaryIO): 输出流
+        batch_size (int, optional): 每批的记录数，默认为1000
+
+    Returns:
+        int: 已处理的记录数
+
+    Raises:
+        StreamError: 输入无法解析或转换过程出错，已转换的批次已写出
+    """
+    func = getattr(conv, method)
+    count = 0
+    try:
+        for batch in read_records(input_file, batch_size):
+            chunk = bytearray()
+            for i, record in enumerate(batch, count + 1):
+                if not isinstance(record, dict):
+                    raise ConversionError(f"第{i}条记录不是JSON对象")
+                key = record.get("key", "")
+                try:
+                    record["text"] = func(conv.prepare(key, record["text"], func))
+                except Exception as e:
+                    raise ConversionError(f"转换{key}时出现错误：{str(e)}") from e
+                chunk += orjson.dumps(record)
+                chunk += b"\n"
+            output_file.write(chunk)
+            output_file.flush()
+            count += len(batch)
+    except ConversionError as e:
+        raise StreamError(str(e), count) from e
+    return count
+
+
+def positive_int(value: str) -> int:
+    """解析正整数命令行参数。
+
+    Args:
+        value (str): 参数值
+
+    Returns:
+        int: 正整数
+
+    Raises:
+        argparse.ArgumentTypeError: 不是正整数
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"“{value}”不是整数") from None
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"{number}不是正整数")
+    return number
+
+
+def parse_args() -> argparse.Namespace:
+    """解析命令行参数。
+
+    Returns:
+        argparse.Namespace: 命令行参数
+    """
+    parser = argparse.ArgumentParser(description="流式转换JSONL记录")
+    parser.add_argument("method", help="转换方法名，如to_pinyin")
+    parser.add_argument("--lang", choices=("zh", "en"), default="zh", help="使用的转换器，默认为zh")
+    parser.add_argument("-i", "--input", help="输入的JSONL文件，默认为标准输入")
+    parser.add_argument("-o", "--output", help="输出的JSONL文件，默认为标准输出")
+    parser.add_argument(
+        "--batch-size", type=positive_int, default=1000, help="每批的记录数，默认为1000"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    conv_class = ChineseConverter if args.lang == "zh" else EnglishConverter
+    if not args.method.startswith("to_") or not callable(getattr(conv_class, args.method, None)):
+        sys.exit(f"转换器中不存在方法“{args.method}”。")
+    conv = conv_class({})
+
+    input_file = open(args.input, "rb") if args.input else sys.stdin.buffer
+    output_file = open(args.output, "wb") if args.output else sys.stdout.buffer
+    start_time = time.time()
+    error = None
+    try:
+        total = convert_stream(conv, args.method, input_file, output_file, args.batch_size)
+    except StreamError as e:
+        total, error = e.count, e
+    except BrokenPipeError:
+        # 下游提前关闭（如head）时静默退出，并使退出时刷新输出流不再出错
+        os.dup2(os.open(os.devnull, os.O_WRONLY), output_file.fileno())
+        sys.exit(1)
+    finally:
+        if args.input:
+            input_file.close()
+        if args.output:
+            output_file.close()
+
+    elapsed_time = time.time() - start_time
+    speed = total / elapsed_time if elapsed_time else 0
+    print(
+        f"已转换{total}条记录，耗时{elapsed_time:.2f} s，速度{speed:.0f}条/s。",
+        file=sys.stderr,
+    )
+    if error:
+        sys.exit(f"转换中断：{str(error)}。")
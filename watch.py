@@ -0,0 +1,377 @@
+"""监视模式：常驻转换器，数据文件变动时仅重新生成受影响的语言文件和键名"""
+
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Final
+
+from pypinyin import Style, pinyin
+from pypinyin.constants import PHRASES_DICT
+from pypinyin.seg import mmseg
+
+import converter
+from base import (
+    DATA,
+    PINYIN_TO,
+    Ldata,
+    P,
+    cy_values,
+    fixed_zh,
+    gr_values,
+    load_json,
+    rep_ja_kk,
+    rep_zh,
+    save_to_json,
+)
+from converter import BaseConverter, ChineseConverter, EnglishConverter
+from pack import LANG_CONVERSIONS
+from segment import get_segmenter
+
+# 受影响的键名，None表示全部键名，空集合表示仅重新应用修正
+type Affected = dict[str, set[str] | None]
+
+# 不分词的转换方法
+UNSEGMENTED: Final[frozenset[str]] = frozenset({"to_ipa", "to_bopomofo", "to_katakana"})
+
+# 拼音映射表与其对应的输出文件
+TABLE_OUTPUTS: Final[dict[str, str]] = {
+    "wadegiles": "zh_wg",
+    "romatzyh": "zh_gr",
+    "simp_romatzyh": "zh_sgr",
+    "mps2": "zh_mps2",
+    "tongyong": "zh_ty",
+    "yale": "zh_yale",
+    "ipa": "zh_ipa",
+    "katakana": "zh_kk",
+    "cyrillic": "zh_cy",
+    "xiaojing": "zh_xj",
+}
+TABLE_FILES: Final[dict[str, str]] = {
+    "wadegiles": "py2wg",
+    "romatzyh": "py2gr",
+    "simp_romatzyh": "py2sgr",
+    "mps2": "py2mps2",
+    "tongyong": "py2ty",
+    "yale": "py2yale",
+    "ipa": "py2ipa",
+    "katakana": "py2kk",
+    "cyrillic": "py2cy",
+    "xiaojing": "py2xj",
+}
+
+
+def replace_in_place(target: dict | set, new: dict | set) -> None:
+    """原地替换字典或集合的内容，保持其他模块中的引用有效。
+
+    Args:
+        target (dict | set): 需要替换的对象
+        new (dict | set): 新的内容
+    """
+    target.clear()
+    target.update(new)
+
+
+def diff_keys(old: dict, new: dict) -> set[str]:
+    """获取两个字典间新增、删除或值改变的键名。
+
+    Args:
+        old (dict): 旧字典
+        new (dict): 新字典
+
+    Returns:
+        set[str]: 变动的键名
+    """
+    return {k for k in old.keys() | new.keys() if old.get(k) != new.get(k)}
+
+
+def merge_affected(total: Affected, part: Affected) -> None:
+    """将部分受影响范围合并到总范围中。
+
+    Args:
+        total (Affected): 总的受影响范围，将被原地修改
+        part (Affected): 新的受影响范围
+    """
+    for output, keys in part.items():
+        if output in total and total[output] is None:
+            continue
+        if keys is None:
+            total[output] = None
+        else:
+            total.setdefault(output, set()).update(keys)
+
+
+class LanguageFileWatcher:
+    """语言文件监视器，常驻内存并缓存未修正的转换结果。
+
+    Attributes:
+        en_conv (EnglishConverter): 英文转换器
+        zh_conv (ChineseConverter): 中文转换器
+        raw (dict[str, Ldata]): 各输出文件未应用修正的转换结果
+        handlers (dict[Path, Callable[[], Affected]]): 各监视文件的处理函数
+        mtimes (dict[Path, int]): 各监视文件的修改时间
+    """
+
+    def __init__(self, segmenter: str = "jieba") -> None:
+        """初始化监视器并注册需要监视的文件。
+
+        Args:
+            segmenter (str, optional): 分词器名称，默认为“jieba”
+        """
+        self.en_conv = EnglishConverter(DATA["en_us"])
+        self.zh_conv = ChineseConverter(DATA["zh_cn"], segmenter=get_segmenter(segmenter))
+        self.raw: dict[str, Ldata] = {}
+        self._phrases = load_json("phrases")
+        self._char_readings: dict[str, set[str]] | None = None
+
+        self.handlers: dict[Path, Callable[[], Affected]] = {
+            P / "data" / "dict.txt": self.reload_user_dict,
+            P / "data" / "phrases.json": self.reload_phrases,
+            P / "data" / "wei.json": self.reload_wei,
+            P / "data" / "manyogana.json": self.reload_manyogana,
+            P / "data" / "rep" / "rep_zh.json": self.reload_rep_zh,
+            P / "data" / "rep" / "rep_ja_kk.json": self.reload_rep_ja_kk,
+            P / "data" / "fixed" / "fixed_zh_universal.json": self.reload_fixed_universal,
+        }
+        for name in ("en_us", "zh_cn"):
+            self.handlers[P / "mc_lang" / "full" / f"{name}.json"] = self._data_handler(name)
+        for scheme in fixed_zh:
+            self.handlers[P / "data" / "fixed" / f"fixed_{scheme}.json"] = self._fixed_handler(
+                scheme
+            )
+        self.handlers[P / "data" / "fixed" / "fixed_zh_py_manual.json"] = self._fixed_handler(
+            "zh_py"
+        )
+        for table, file in TABLE_FILES.items():
+            self.handlers[P / "data" / f"{file}.json"] = self._table_handler(table)
+
+        self.mtimes: dict[Path, int] = {p: p.stat().st_mtime_ns for p in self.handlers}
+
+    def _conv(self, output: str) -> BaseConverter:
+        """获取输出文件对应的转换器。"""
+        return self.en_conv if output.startswith(("en_", "ja_")) else self.zh_conv
+
+    def _outputs(self, predicate: Callable[[str, str], bool]) -> list[str]:
+        """筛选满足条件的输出文件。"""
+        return [output for method, output, _ in LANG_CONVERSIONS if predicate(method, output)]
+
+    def build_all(self) -> float:
+        """完整生成所有语言文件并缓存转换结果。
+
+        Returns:
+            float: 生成耗时（秒）
+        """
+        start_time = time.time()
+        self.regenerate({output: None for _, output, _ in LANG_CONVERSIONS})
+        return time.time() - start_time
+
+    def regenerate(self, affected: Affected) -> None:
+        """重新生成受影响的语言文件。
+
+        Args:
+            affected (Affected): 受影响的输出文件及键名
+        """
+        for method, output, fix_dict in LANG_CONVERSIONS:
+            if output not in affected:
+                continue
+            start_time = time.time()
+            conv = self._conv(output)
+            func = getattr(conv, method)
+            keys = affected[output]
+            if keys is None or output not in self.raw:
+                raw = conv.convert_items(func)
+            else:
+                old = self.raw[output]
+                new = conv.convert_items(func, [k for k in conv.data if k in keys or k not in old])
+                raw = {k: new[k] if k in new else old[k] for k in conv.data}
+            self.raw[output] = raw
+            output_dict = conv.apply_fixes(raw.copy(), fix_dict)
+            save_to_json((output_dict, time.time() - start_time), output)
+
+    def poll(self) -> Affected:
+        """检查监视文件的变动并重新载入。
+
+        Returns:
+            Affected: 受影响的输出文件及键名
+        """
+        affected: Affected = {}
+        for path, handler in self.handlers.items():
+            try:
+                mtime = path.stat().st_mtime_ns
+                if mtime == self.mtimes[path]:
+                    continue
+                print(f"检测到“{path.relative_to(P)}”发生变动。")
+                merge_affected(affected, handler())
+                self.mtimes[path] = mtime
+            except Exception as e:  # 文件编辑到一半时可能无法解析，下次轮询时重试
+                print(f"重新载入“{path.relative_to(P)}”失败：{str(e)}")
+        return affected
+
+    def _keys_containing(self, words: set[str]) -> set[str]:
+        """获取预处理前后的中文字符串中包含指定词语的键名。"""
+        conv = self.zh_conv
+        keys: set[str] = set()
+        for k, v in conv.data.items():
+            prepared = conv.prepare(k, v, conv.to_pinyin)
+            if any(w in v or w in prepared for w in words):
+                keys.add(k)
+        return keys
+
+    def _data_handler(self, name: str) -> Callable[[], Affected]:
+        """生成语言文件的处理函数。"""
+
+        def handler() -> Affected:
+            data = DATA[name]
+            new = load_json(name, "mc_lang/full")
+            changed = {k for k, v in new.items() if data.get(k) != v}
+            replace_in_place(data, new)
+            if name == "zh_cn":
+                self._char_readings = None  # 新字符串可能含有未计算读音的汉字
+            prefix = ("en_", "ja_") if name == "en_us" else ("zh_",)
+            return {o: changed for o in self._outputs(lambda _, o: o.startswith(prefix))}
+
+        return handler
+
+    def _fixed_handler(self, scheme: str) -> Callable[[], Affected]:
+        """生成修正文件的处理函数，仅需重新应用修正。"""
+
+        def handler() -> Affected:
+            new = load_json(f"fixed_{scheme}", "data/fixed")
+            if scheme == "zh_py":
+                new.update(load_json("fixed_zh_py_manual", "data/fixed"))
+            replace_in_place(fixed_zh[scheme], new)
+            return {o: set() for _, o, f in LANG_CONVERSIONS if f is fixed_zh[scheme]}
+
+        return handler
+
+    def _table_handler(self, table: str) -> Callable[[], Affected]:
+        """生成拼音映射表的处理函数，仅重新转换含有相关读音汉字的字符串。
+
+        国语罗马字和西里尔字母的音节集合用于判断是否添加隔音符号。集合变动时，只有相邻音节拼接后
+        含有增删的拼写才可能受影响，这些拼写必然出现在去除隔音符号的原转换结果中。
+        """
+
+        def handler() -> Affected:
+            output = TABLE_OUTPUTS[table]
+            new = load_json(TABLE_FILES[table])
+            syllables = {s.rstrip("12345") for s in diff_keys(PINYIN_TO[table], new)}
+            replace_in_place(PINYIN_TO[table], new)
+
+            readings = self.char_readings()
+            chars = {c for c, r in readings.items() if r & syllables}
+            keys = {k for k, v in self.zh_conv.data.items() if not chars.isdisjoint(v)}
+
+            values = {"romatzyh": gr_values, "cyrillic": cy_values}.get(table)
+            if values is not None and values != set(new.values()):
+                spellings = {v.lower() for v in values.symmetric_difference(new.values())}
+                replace_in_place(values, set(new.values()))
+                if output not in self.raw or "" in spellings:
+                    return {output: None}
+                keys.update(
+                    k
+                    for k, v in self.raw[output].items()
+                    if any(s in v.lower().replace("'", "") for s in spellings)
+                )
+            return {output: keys}
+
+        return handler
+
+    def char_readings(self) -> dict[str, set[str]]:
+        """获取语言文件中各汉字所有可能的无声调读音，首次调用时计算。
+
+        Returns:
+            dict[str, set[str]]: 汉字到读音集合的映射
+        """
+        if self._char_readings is None:
+            chars = set("".join(self.zh_conv.data.values()))
+            self._char_readings = {
+                c: set(pinyin(c, style=Style.NORMAL, heteronym=True)[0]) for c in chars
+            }
+            self._add_phrase_readings(self._phrases)
+        return self._char_readings
+
+    def _add_phrase_readings(self, phrases: Ldata) -> None:
+        """将自定义词语中的读音加入各汉字的读音，这些读音可能不在单字读音中。"""
+        for phrase, value in phrases.items():
+            for c, py in zip(phrase, value.split(), strict=False):
+                self._char_readings.setdefault(c, set()).update(pinyin(py, style=Style.NORMAL)[0])
+
+    def reload_user_dict(self) -> Affected:
+        """重新载入自定义词典并更新分词器，仅重新转换含有词频变动词语的分词字符串。"""
+        changed = self.zh_conv.segmenter.load_user_dict()
+        keys = self._keys_containing(changed)
+        return {
+            o: keys
+            for o in self._outputs(lambda m, o: o.startswith("zh_") and m not in UNSEGMENTED)
+        }
+
+    def reload_phrases(self) -> Affected:
+        """重新载入pypinyin自定义词语，仅重新转换含有变动词语的字符串。"""
+        new = load_json("phrases")
+        changed = diff_keys(self._phrases, new)
+        for phrase in changed:
+            converter.phrases_base.setdefault(phrase, PHRASES_DICT.get(phrase))
+            if phrase in new:
+                PHRASES_DICT[phrase] = [[_] for _ in new[phrase].split()]
+            elif (base := converter.phrases_base[phrase]) is not None:
+                PHRASES_DICT[phrase] = base  # 删除的词语恢复为词典数据中的读音
+            else:
+                PHRASES_DICT.pop(phrase, None)
+        mmseg.seg.train(p for p in changed if p in PHRASES_DICT)
+        self._phrases = new
+        if self._char_readings is not None:
+            # 读音只增不减，多余的读音仅会使重新转换的范围略大
+            self._add_phrase_readings({p: v for p, v in new.items() if p in changed})
+        converter.char_pinyin.reset()
+
+        keys = self._keys_containing(changed)
+        return {
+            o: keys for o in self._outputs(lambda m, o: o.startswith("zh_") and m != "to_split")
+        }
+
+    def reload_wei(self) -> Affected:
+        """重新载入需替换“为”的键名。"""
+        new = load_json("wei")
+        changed = set(converter.wei).symmetric_difference(new)
+        converter.wei[:] = new
+        return {
+            o: changed for o in self._outputs(lambda m, o: o.startswith("zh_") and m != "to_split")
+        }
+
+    def reload_manyogana(self) -> Affected:
+        """重新载入万叶假名映射。"""
+        replace_in_place(converter.manyoganas_dict, load_json("manyogana"))
+        return {"ja_my": None}
+
+    def reload_rep_zh(self) -> Affected:
+        """重新载入中文转写方案替换修正。"""
+        replace_in_place(rep_zh, load_json("rep_zh", "data/rep"))
+        return {o: None for o in self._outputs(lambda _, o: o.startswith("zh_"))}
+
+    def reload_rep_ja_kk(self) -> Affected:
+        """重新载入片假名替换修正。"""
+        replace_in_place(rep_ja_kk, load_json("rep_ja_kk", "data/rep"))
+        return {"ja_kk": None, "ja_my": None}
+
+    def reload_fixed_universal(self) -> Affected:
+        """重新载入中文通用修正，仅需重新应用修正。"""
+        replace_in_place(converter.fixed_zh_u, load_json("fixed_zh_universal", "data/fixed"))
+        return {o: set() for o in self._outputs(lambda _, o: o.startswith("zh_"))}
+
+    def watch(self, interval: float = 0.5) -> None:
+        """持续监视数据文件，按Ctrl+C退出。
+
+        Args:
+            interval (float, optional): 轮询间隔（秒），默认为0.5
+        """
+        gen_time = self.build_all()
+        print(f"\n语言文件生成完毕，共耗时{gen_time:.2f} s。正在监视数据文件变动……")
+        try:
+            while True:
+                time.sleep(interval)
+                affected = self.poll()
+                if affected:
+                    start_time = time.time()
+                    self.regenerate(affected)
+                    print(f"增量更新完毕，耗时{time.time() - start_time:.2f} s。\n")
+        except KeyboardInterrupt:
+            print("\n已退出监视模式。")